@@ -1,10 +1,72 @@
 import sqlite3, json
+import os, re, sys, math, time, queue, threading
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from operator import itemgetter
+from pathlib import Path
 from datetime import datetime
 from enum import Enum, auto
 from dataclasses import dataclass, fields
-from typing import Any, List, Tuple, Dict
+from typing import Any, Callable, Iterator, List, Tuple, Dict
 import warnings
 
+def _has_big_float(obj: Any) -> bool:
+    '''
+    True if an orjson.loads result has a float outside [-2**63, 2**64), the
+    range where orjson reads integers as float
+    '''
+    for value in (obj.values() if type(obj) is dict else obj if type(obj) is list else (obj,)):
+        kind = type(value)
+        if kind is float:
+            if value >= 18446744073709551616.0 or value <= -9223372036854775808.0:
+                return True
+        elif (kind is dict or kind is list) and _has_big_float(value):
+            return True
+    return False
+
+def _has_non_finite(obj: Any) -> bool:
+    '''
+    True if obj (dict / list / tuple) has a NaN or Infinity float
+    '''
+    if isinstance(obj, dict):
+        obj = obj.values()
+    elif not isinstance(obj, (list, tuple)):
+        return isinstance(obj, float) and not math.isfinite(obj)
+    return any(_has_non_finite(value) for value in obj if isinstance(value, (float, dict, list, tuple)))
+
+try:
+    import orjson
+
+    def _json_loads(data: str | bytes) -> Any:
+        '''
+        orjson.loads with the json.loads result where they differ: NaN,
+        Infinity, lone surrogates (orjson error) and integers outside 64 bits
+        (orjson float)
+        '''
+        try:
+            obj = orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+        if _has_big_float(obj):
+            return json.loads(data)
+        return obj
+
+    def _json_dumps(obj: Any) -> str:
+        '''
+        orjson.dumps with the json.dumps result for the values orjson does not
+        write the same: NaN / Infinity (orjson null) and unsupported values
+        (ex: integers outside 64 bits)
+        '''
+        if _has_non_finite(obj):
+            return json.dumps(obj)
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except (orjson.JSONEncodeError, TypeError):
+            return json.dumps(obj)
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 
 class datatypes(Enum):
     '''
@@ -46,6 +108,233 @@ class datatypes(Enum):
         return value.timestamp()
 
 
+# Firma memorizada por minuto: (minuto epoch, firma)
+_firm_cache: Tuple[int, str] = (-1, "")
+
+def get_firm() -> str:
+    '''
+    Returns the local date and time firm string 'YYYY-MM-DD / HH:MM'
+    '''
+    global _firm_cache
+    t = time.time()
+    minute = int(t // 60)
+    if _firm_cache[0] != minute:
+        lt = time.localtime(t)
+        firm = f"{lt.tm_year:04d}-{lt.tm_mon:02d}-{lt.tm_mday:02d} / {lt.tm_hour:02d}:{lt.tm_min:02d}"
+        _firm_cache = (minute, firm)
+    return _firm_cache[1]
+
+
+# Ajustes por conexión (journal_mode se fija aparte: no es posible en conexiones de solo lectura)
+_PRAGMA_SCRIPT = '''
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-262144;
+PRAGMA mmap_size=268435456;
+PRAGMA foreign_keys=ON;
+'''
+
+# cached_statements ampliado solo en versiones sin el bug del cache de sentencias
+_CONNECT_KWARGS: Dict[str, Any] = {'cached_statements': 256} if sys.version_info >= (3, 12, 3) else {}
+
+_DDL_RE = re.compile(r"^\s*(?:CREATE|DROP|ALTER|REINDEX)\b", re.IGNORECASE | re.MULTILINE)
+# Lecturas: SELECT / WITH (incluye SELECT ... FROM pragma_*()) o PRAGMA sin argumentos.
+# PRAGMA con argumento (= o paréntesis) y los que escriben aunque no lleven argumento van al writer.
+_SELECT_RE = re.compile(
+    r"^\s*(?:SELECT|WITH)\b"
+    r"|^\s*PRAGMA\s+(?:\w+\s*\.\s*)?(?!(?:wal_checkpoint|optimize|incremental_vacuum|shrink_memory)\b)\w+\s*;?\s*$",
+    re.IGNORECASE
+)
+# CTE con escritura (WITH ... INSERT/UPDATE/DELETE)
+_WRITE_RE = re.compile(r"\b(?:INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+# (realpath, table) -> ((st_dev, st_ino, schema_version, table sql), fields)
+_SCHEMA_CACHE: Dict[Tuple[str, str], Tuple[tuple, dict]] = {}
+
+@lru_cache(maxsize=256)
+def _quote_ident(name: str) -> str:
+    '''
+    Returns the SQL quoted identifier (table or column name)
+    '''
+    return '"' + name.replace('"', '""') + '"'
+
+def _quote_table(name: str) -> str:
+    '''
+    Returns the SQL quoted table name, quoting each part of 'schema.table'
+    '''
+    return ".".join(_quote_ident(part) for part in name.split("."))
+
+def _connect(path_db: str, readonly: bool = False) -> sqlite3.Connection:
+    '''
+    Returns a new autocommit connection with the module PRAGMAs applied
+
+    Parameters
+    ----------
+    path_db : str
+        Path string of SQLite Database
+
+    readonly : bool
+        Open the database file in read only mode (mode=ro)
+    '''
+    if readonly:
+        conn = sqlite3.connect(
+            Path(path_db).resolve().as_uri() + "?mode=ro",
+            timeout=5,
+            check_same_thread=False,
+            isolation_level=None,
+            uri=True,
+            **_CONNECT_KWARGS
+        )
+    else:
+        conn = sqlite3.connect(
+            path_db,
+            timeout=5,
+            check_same_thread=False,
+            isolation_level=None,
+            **_CONNECT_KWARGS
+        )
+    if not readonly:
+        try:
+            conn.execute("PRAGMA journal_mode=WAL;")
+        except sqlite3.DatabaseError:
+            pass  # ignora si ya está configurado
+    conn.executescript(_PRAGMA_SCRIPT)
+    return conn
+
+def _is_read(sql: str) -> bool:
+    '''
+    True if the sql string only reads from the database
+    '''
+    return _SELECT_RE.match(sql) is not None and _WRITE_RE.search(sql) is None
+
+
+class ConnectionPool:
+    '''
+    SQLite connection pool with one writer and several readers
+
+    Parameters
+    ----------
+    path_db : str
+        Path string of SQLite Database
+
+    min_size : int
+        Reader connections opened at construction time
+
+    max_size : int
+        Pooled reader connections (default os.cpu_count()). When all of them
+        are busy a temporary reader is opened and closed on release.
+
+    Functions
+    ---------
+    - acquire_reader
+    - release_reader
+    - acquire_writer
+    - release_writer
+    - close
+    '''
+    def __init__(self, path_db: str, min_size: int = 2, max_size: int = None) -> None:
+        self.__path_db = path_db
+        self.__max_size = max(max_size or os.cpu_count() or 1, min_size)
+        self.__writer = _connect(path_db)
+        self.__writer_lock = threading.RLock()
+        self.__readers: queue.Queue = queue.Queue()
+        self.__readers_lock = threading.Lock()
+        self.__pooled: set = set()
+        self.__closed: bool = False
+        # Las bases de datos en memoria no se pueden compartir entre conexiones
+        self.__shared = path_db not in (":memory:", "")
+        if self.__shared:
+            for _ in range(min_size):
+                self.__readers.put(self.__new_reader())
+
+    def __new_reader(self) -> sqlite3.Connection:
+        conn = _connect(self.__path_db, readonly=True)
+        self.__pooled.add(conn)
+        return conn
+
+    def acquire_reader(self) -> sqlite3.Connection:
+        '''
+        Returns a read only connection, never waiting for a busy reader
+        '''
+        if not self.__shared:
+            return self.acquire_writer()
+        try:
+            return self.__readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self.__readers_lock:
+            if len(self.__pooled) < self.__max_size:
+                return self.__new_reader()
+        # Pool agotado (ej: iter_select anidados): lector temporal en lugar de esperar
+        return _connect(self.__path_db, readonly=True)
+
+    def release_reader(self, conn: sqlite3.Connection) -> None:
+        '''
+        Returns a connection obtained with acquire_reader to the pool
+        '''
+        if conn is self.__writer:
+            self.release_writer()
+            return
+        with self.__readers_lock:
+            if conn in self.__pooled and not self.__closed:
+                self.__readers.put(conn)
+                return
+        conn.close()
+
+    def acquire_writer(self) -> sqlite3.Connection:
+        '''
+        Returns the read/write connection, locked for the calling thread
+        '''
+        self.__writer_lock.acquire()
+        return self.__writer
+
+    def release_writer(self) -> None:
+        '''
+        Unlocks the read/write connection
+        '''
+        self.__writer_lock.release()
+
+    def close(self) -> None:
+        '''
+        Closes the writer and the idle reader connections (busy readers are closed on release)
+        '''
+        with self.__readers_lock:
+            self.__closed = True
+        while True:
+            try:
+                self.__readers.get_nowait().close()
+            except queue.Empty:
+                break
+        self.__writer.close()
+
+
+def _with_connection(func: Callable = None, *, route_reads: bool = False):
+    '''
+    SQL method decorator: runs the method with a pooled connection cursor in 'self.curr'
+
+    Methods run on the writer connection. With route_reads=True the first
+    argument ('sql') is checked and read only statements use a reader.
+    '''
+    if func is None:
+        return lambda func: _with_connection(func, route_reads=route_reads)
+    @wraps(func)
+    def wrapper(self: 'SQL', *args, **kwargs):
+        readonly = False
+        if route_reads:
+            sql = args[0] if args else kwargs.get('sql')
+            readonly = isinstance(sql, str) and _is_read(sql)
+        with self._acquire(readonly) as (conn, cursor):
+            previous, self.curr = self.curr, cursor
+            try:
+                result = func(self, *args, **kwargs)
+                if kwargs.get('commit', False) and conn.in_transaction:
+                    conn.commit()
+                return result
+            finally:
+                self.curr = previous
+    return wrapper
+
+
 class SQL:
     '''
     SQLite Database Object with basic functions
@@ -55,76 +344,86 @@ class SQL:
     - execute
     - script
     - select
+    - iter_select
     - insert
+    - insert_many
+    - make_inserter
     - update
+    - get_table_fields
+    - close
     '''
+    # fetch (execute) -> función de lectura del cursor
+    _FETCH: Dict[int, Callable[[sqlite3.Cursor], Any]] = {
+        0: lambda c: None,
+        1: lambda c: c.fetchone(),
+        2: lambda c: c.fetchall(),
+        3: lambda c: c.fetchmany(),
+        4: lambda c: [field[0] for field in c.description],
+        5: lambda c: c.rowcount,
+    }
+
     def __init__(self, path_db: str) -> None:
         self.__path_db = path_db
-        self.curr: sqlite3.Cursor = None
+        self.__local = threading.local()
         self.__max_retries: int = 3
         self.__retry_delay: float = 0.5
+        self._pool: ConnectionPool = None
+        self.__pool_lock = threading.Lock()
+        self._insert_tpl: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+        self._update_tpl: Dict[Tuple[str, Tuple[str, ...], Tuple[str, ...]], str] = {}
+
+    def __enter__(self) -> 'SQL':
+        return self
 
-    def __set_wal_mode(self, conn: sqlite3.Connection):
-        """Activa el modo WAL solo una vez por conexión."""
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def curr(self) -> sqlite3.Cursor:
+        '''
+        Cursor of the current thread call
+        '''
+        return getattr(self.__local, 'curr', None)
+
+    @curr.setter
+    def curr(self, cursor: sqlite3.Cursor) -> None:
+        self.__local.curr = cursor
+
+    def __get_pool(self) -> ConnectionPool:
+        """Crea el pool de conexiones la primera vez que se necesita (una sola vez entre threads)."""
+        pool = self._pool
+        if pool is None:
+            with self.__pool_lock:
+                pool = self._pool
+                if pool is None:
+                    pool = self._pool = ConnectionPool(self.__path_db, min_size=2, max_size=os.cpu_count())
+        return pool
+
+    def close(self) -> None:
+        '''
+        Closes the pooled database connections
+        '''
+        with self.__pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+
+    @contextmanager
+    def _acquire(self, readonly: bool = False) -> Iterator[Tuple[sqlite3.Connection, sqlite3.Cursor]]:
+        """Presta una conexión del pool (lectura o escritura) con un cursor nuevo."""
+        pool = self.__get_pool()
+        conn = pool.acquire_reader() if readonly else pool.acquire_writer()
+        cursor = conn.cursor()
         try:
-            conn.execute("PRAGMA journal_mode=WAL;")
-        except sqlite3.DatabaseError:
-            pass  # ignora si ya está configurado
+            yield conn, cursor
+        finally:
+            cursor.close()
+            if readonly:
+                pool.release_reader(conn)
+            else:
+                pool.release_writer()
 
-    @staticmethod
-    def __connection(func):
-        def wrapper(self, *args, **kwargs):
-            conn = sqlite3.connect(
-                self.__path_db,
-                timeout=5, 
-                check_same_thread=False
-            )
-            self.__set_wal_mode(conn)
-            self.curr = conn.cursor()
-            commit = kwargs.get('commit', False)
-            try: 
-                result = func(self, *args, **kwargs)
-                if commit: 
-                    conn.commit()
-                return result
-            finally:
-                conn.close()
-        return wrapper
-
-    # @staticmethod
-    # def __with_retry(func):
-    #     """Decorador interno para manejar conexión + reintentos automáticos."""
-    #     @wraps(func)
-    #     def wrapper(self, *args, **kwargs):
-    #         retries = self.__max_retries
-    #         last_error = None
-    #         for attempt in range(retries):
-    #             try:
-    #                 # check_same_thread=False → permite uso desde diferentes threads
-    #                 conn = sqlite3.connect(self.__path_db, timeout=5, check_same_thread=False)
-    #                 self.__set_wal_mode(conn)
-    #                 self.curr = conn.cursor()
-    #                 commit = kwargs.get('commit', False)
-    #                 try:
-    #                     result = func(self, *args, **kwargs)
-    #                     if commit:
-    #                         conn.commit()
-    #                     return result
-    #                 finally:
-    #                     conn.close()
-    #             except sqlite3.OperationalError as e:
-    #                 if "locked" in str(e).lower():
-    #                     last_error = e
-    #                     if attempt < retries - 1:
-    #                         time.sleep(self.__retry_delay * (attempt + 1))  # backoff progresivo
-    #                         continue
-    #                 raise
-    #         # si después de los reintentos sigue fallando, relanzamos
-    #         raise last_error or sqlite3.OperationalError("Database operation failed.")
-    #     return wrapper
-
-
-    @__connection
+    @_with_connection(route_reads=True)
     def execute(self, sql: str, values: list[any] | tuple[any] = None, fetch: int = 2, commit: bool = False):
         '''
         Extended sql execute function
@@ -138,7 +437,7 @@ class SQL:
             Optional iterable object to use in case that sql string use '?' placeholders
         
         Fetch : int
-            Integer value with diferent kind of fetch (1.Fecthone, 2.Fecthall, 3.Fecthmany, 4.Description)
+            Integer value with diferent kind of fetch (1.Fecthone, 2.Fecthall, 3.Fecthmany, 4.Description, 5.Rowcount)
 
         commit : bool
             Boolean value to commit changes in the database
@@ -150,18 +449,18 @@ class SQL:
             - 2. Fecthall -> list[tuple]
             - 3. Fecthmany -> list[tuple][:size] ⚠️ INCOMPLETE
             - 4. Description -> tuple[str]
+            - 5. Rowcount -> int
         '''
+        if _DDL_RE.match(sql):
+            SCHEMA.clear_cache(self.__path_db)
         if values:
             result = self.curr.execute(sql, values)
         else:
             result = self.curr.execute(sql)
-        match fetch:
-            case 1: return result.fetchone()
-            case 2: return result.fetchall()
-            case 3: return result.fetchmany()
-            case 4: return [field[0] for field in result.description]
+        fetcher = SQL._FETCH.get(fetch)
+        return fetcher(result) if fetcher else None
 
-    @__connection
+    @_with_connection
     def executemany(self, sql: str, values: list[any] | tuple[any] = None, commit=True):
         '''⚠️ INCOMPLETE
         Extended sql executemany function
@@ -198,8 +497,10 @@ class SQL:
         else:
             result = self.curr.executemany(sql)
 
-    @__connection
+    @_with_connection
     def script(self, sql_script: str, commit: bool = True):
+        if _DDL_RE.search(sql_script):
+            SCHEMA.clear_cache(self.__path_db)
         self.curr.executescript(sql_script)
 
     def select(self, sql: str) -> list[any]:
@@ -214,6 +515,34 @@ class SQL:
         """
         return self.execute(sql, values=False, fetch=2, commit=False)
 
+    def iter_select(self, sql: str, values: list[any] | tuple[any] = None, arraysize: int = 1000, row_factory: Callable = None) -> Iterator[Any]:
+        """
+        SELECT generator that streams the records in blocks instead of fetching all of them
+
+        The connection is held until the generator is exhausted or closed.
+
+        Parameters
+        ----------
+        sql : str
+            SQL string to execute
+
+        values :  list[any] or tuple[any]
+            Optional iterable object to use in case that sql string use '?' placeholders
+
+        arraysize : int
+            Number of records read from SQLite in each block
+
+        row_factory : Callable
+            Optional cursor row factory (ex: sqlite3.Row)
+        """
+        with self._acquire(_is_read(sql)) as (conn, cursor):
+            cursor.arraysize = arraysize
+            if row_factory:
+                cursor.row_factory = row_factory
+            cursor.execute(sql, values or ())
+            while rows := cursor.fetchmany():
+                yield from rows
+
     def insert(self, table: str, values: dict[str, any]) -> None:
         """
         INSERT string function
@@ -226,14 +555,90 @@ class SQL:
         values :  dict[str, any]
             Dictionary with fields and values {'field1': 'New value'}
         """
-        # values['firm'] = get_firm('test')
-        columns = ", ".join(f'"{col}"' for col in values.keys())
-        values = tuple(values.values())
-        placeholders = ", ".join("?" for _ in values)
-        sql = f'''INSERT INTO {table} ({columns}) VALUES ({placeholders});'''
-        self.execute(sql, values, fetch=0, commit=True)
-
-    def update(self, table: str, values: dict[str, any], where: dict[str, any]) -> None:
+        # values['firm'] = get_firm()
+        columns = tuple(sorted(values))
+        sql = self.__get_insert_sql(table, columns)
+        self.execute(sql, tuple(values[col] for col in columns), fetch=0, commit=True)
+
+    @_with_connection
+    def insert_many(self, table: str, rows: List[Dict[str, Any]], columns: Tuple[str, ...] = None) -> None:
+        """
+        INSERT of several records in a single transaction (executemany)
+
+        Parameters
+        ----------
+        table : str
+            String table name
+        
+        rows :  list[dict[str, any]]
+            List of dictionaries with fields and values [{'field1': 'New value'}, ...]
+
+        columns : tuple[str]
+            Optional columns to insert, by default the keys of the rows (must be the same in all rows)
+        """
+        if not rows:
+            return
+        if columns:
+            columns = tuple(columns)
+        else:
+            columns = tuple(sorted(rows[0]))
+            keys = set(columns)
+            if any(row.keys() != keys for row in rows):
+                raise ValueError("All the rows must have the same keys, or use the 'columns' parameter")
+        sql = self.__get_insert_sql(table, columns)
+        params = [tuple(row[col] for col in columns) for row in rows]
+        self.curr.execute("BEGIN;")
+        try:
+            self.curr.executemany(sql, params)
+            self.curr.execute("COMMIT;")
+        except Exception:
+            self.curr.execute("ROLLBACK;")
+            raise
+
+    def make_inserter(self, table: str, columns: Tuple[str, ...]) -> Callable[[Dict[str, Any]], None]:
+        """
+        Returns an INSERT function specialized for a fixed table and columns
+
+        The SQL and the values getter are built once, so each call only reads
+        the values of the record and executes the statement.
+
+        Parameters
+        ----------
+        table : str
+            String table name
+
+        columns : tuple[str]
+            Columns to insert from each record
+
+        Example
+        -------
+        ```
+        insert_user = DB.make_inserter('users', ('id', 'name'))
+        for user in users:
+            insert_user(user)
+        ```
+        """
+        columns = tuple(columns)
+        sql = self.__get_insert_sql(table, columns)
+        getter = itemgetter(*columns)
+        params = (lambda row: (getter(row),)) if len(columns) == 1 else getter
+        execute = self.execute
+
+        def inserter(row: Dict[str, Any]) -> None:
+            execute(sql, params(row), fetch=0, commit=True)
+        return inserter
+
+    def __get_insert_sql(self, table: str, columns: Tuple[str, ...]) -> str:
+        """Plantilla INSERT cacheada por tabla y columnas."""
+        key = (table, columns)
+        sql = self._insert_tpl.get(key)
+        if sql is None:
+            columns_str = ", ".join(_quote_ident(col) for col in columns)
+            placeholders = ", ".join("?" for _ in columns)
+            sql = self._insert_tpl[key] = f'''INSERT INTO {_quote_table(table)} ({columns_str}) VALUES ({placeholders});'''
+        return sql
+
+    def update(self, table: str, values: dict[str, any], where: dict[str, any]) -> bool:
         """
         UPDATE string function restricted with mandatory where filter
 
@@ -247,21 +652,27 @@ class SQL:
         
         where :  dict[str, any]
             Dictionary with where filters {'id': 'the id value'}
+
+        Returns
+        -------
+        bool
+            True if any record was updated
         """
-        values_str = ", ".join(f'"{col}"=?' for col in values.keys())
-        where_str = ' AND '.join(f'"{col}"=?' for col in where.keys())
-        count = self.execute(
-            sql=f"SELECT COUNT(*) FROM {table} WHERE {where_str}", 
-            values=list(where.values()), 
-            fetch=1
-        )[0]
-        if count:
-            self.execute(
-                sql=f'''UPDATE {table} SET {values_str} WHERE {where_str};''', 
-                values=list(values.values()) + list(where.values()), 
-                fetch=0,
-                commit=True
-            )
+        columns = tuple(sorted(values))
+        where_columns = tuple(sorted(where))
+        key = (table, columns, where_columns)
+        sql = self._update_tpl.get(key)
+        if sql is None:
+            values_str = ", ".join(f'{_quote_ident(col)}=?' for col in columns)
+            where_str = ' AND '.join(f'{_quote_ident(col)}=?' for col in where_columns)
+            sql = self._update_tpl[key] = f'''UPDATE {_quote_table(table)} SET {values_str} WHERE {where_str};'''
+        rowcount = self.execute(
+            sql=sql, 
+            values=[values[col] for col in columns] + [where[col] for col in where_columns], 
+            fetch=5,
+            commit=True
+        )
+        return rowcount > 0
 
     def get_json(self, table: str, json_column: str, where_column: str, where_value: Any) -> Dict[str, Any]:
         '''
@@ -281,14 +692,12 @@ class SQL:
         where_value :  str
             Value of the 'where' filter
         '''
-        if self.execute(sql=f'SELECT COUNT (*) FROM {table} WHERE {where_column}=?', values=[where_value], fetch=1)[0] != 1:
-            return None
-
-        json_data = self.execute(f'SELECT {json_column} FROM {table} WHERE {where_column}=?', values=[where_value], fetch=1)[0]
-        if not json_data:
+        table, json_column, where_column = _quote_table(table), _quote_ident(json_column), _quote_ident(where_column)
+        rows = self.execute(f'SELECT {json_column} FROM {table} WHERE {where_column}=? LIMIT 2', values=[where_value], fetch=2)
+        if len(rows) != 1 or not rows[0][0]:
             return None
         
-        return json.loads(json_data)
+        return _json_loads(rows[0][0])
     
     def update_json(self, table: str, json_column: str, where_column: str, where_value: Any, update_values: Dict[str, Any]) -> bool:
         '''
@@ -309,26 +718,42 @@ class SQL:
             Value of the 'where' filter
         
         update_values : dict[str, any]
-            New values to add or update
+            New values to add or update (keys can not contain '"')
+        '''
+        # Las rutas JSON de SQLite no admiten '"' en una clave entre comillas
+        for k in update_values:
+            if '"' in str(k):
+                raise ValueError(f"update_json keys can not contain '\"': {k!r}")
+
+        # json_set sobre el registro en una sola sentencia (solo si hay exactamente un registro)
+        table, json_column, where_column = _quote_table(table), _quote_ident(json_column), _quote_ident(where_column)
+        paths = ", ".join("?, json(?)" for _ in update_values)
+        sql = f'''
+        UPDATE {table} SET {json_column}=json_set(COALESCE(NULLIF({json_column}, ''), '{{}}'){", " if paths else ""}{paths})
+        WHERE {where_column}=? AND (SELECT COUNT(*) FROM {table} WHERE {where_column}=?)=1;
         '''
-        if self.execute(sql=f'SELECT COUNT (*) FROM {table} WHERE {where_column}=?', values=[where_value], fetch=1)[0] != 1:
-            return False
+        values = []
+        for k, v in update_values.items():
+            values += [f'$."{k}"', _json_dumps(v)]
+        values += [where_value, where_value]
+        return self.execute(sql, values, fetch=5, commit=True) == 1
+
+    @_with_connection
+    def get_table_fields(self, table: str) -> Dict[str, 'SCHEMA.FIELD']:
+        '''
+        Returns a dict with values SCHEMA.FIELD of the defined table using the open connection
 
-        json_dict = self.get_json(table=table, json_column=json_column, where_column=where_column, where_value=where_value)
-        
-        if not json_dict:
-            json_dict = update_values
-        else:
-            for k, v in update_values.items():
-                json_dict[k] = v
-        
-        self.update(table=table, values={json_column: json.dumps(json_dict)}, where={where_column: where_value})
-        return True
+        Parameters
+        ----------
+        table : str
+            Table name
+        '''
+        return _get_table_fields(self.curr, table)
 
 
 class SCHEMA:
 
-    @dataclass
+    @dataclass(slots=True, frozen=True)
     class FIELD:
         '''
         Table Schema Field
@@ -375,31 +800,33 @@ class SCHEMA:
             table : str
                 Tuple with the values returned by the 'PRAGMA table_info' sql
             '''
-            conn = sqlite3.connect(path_db)
-            cur = conn.cursor()
-
-            sql = f'''PRAGMA index_list({table});'''
-            index_rows = cur.execute(sql).fetchall()
-            index_uniques = [index[1] for index in index_rows if index[2]]
-            uniques = []
-            for index in index_uniques:
-                index_data = cur.execute(f"PRAGMA index_info({index})").fetchone()
-                uniques.append(index_data[2])
-            
-            sql = f'''PRAGMA table_info({table});'''
-            tbl_data = cur.execute(sql).fetchall()
-            conn.close()
-            data_dict = dict()
-            for field in tbl_data:
-                field_obj = SCHEMA.FIELD.get_from_tuple(field)
-                if field[1] in uniques: field_obj.unique = True 
-                data_dict[field_obj.name] = field_obj
-            
-            return data_dict
+            conn = _connect(path_db)
+            try:
+                return _get_table_fields(conn.cursor(), table)
+            finally:
+                conn.close()
+
+    @staticmethod
+    def clear_cache(path_db: str = None) -> None:
+        '''
+        Clears the cached table fields used by get_table_fields
+
+        Parameters
+        ----------
+        path_db : str
+            Only clear the tables of this database (default: all)
+        '''
+        if path_db is None:
+            _SCHEMA_CACHE.clear()
+            return
+        path_db = os.path.realpath(path_db)
+        for key in [key for key in _SCHEMA_CACHE if key[0] == path_db]:
+            del _SCHEMA_CACHE[key]
 
     def get_sql_create(enum_class: type[Enum], table_name: str = None) -> str:
         """
         Gets a CREATE TABLE string from Enum class with SCHEMA.FIELD definitions.
+        Classes decorated with @schema return the precompiled string.
 
         Parameters
         ----------
@@ -423,28 +850,112 @@ class SCHEMA:
 
         ```
         """
-        table_name = table_name or enum_class.__name__
-        columns = []
-
-        for member in enum_class:
-            field: SCHEMA.FIELD = member.value
-            col_parts = [field.name]
-            
-            if isinstance(field.type, datatypes):
-                col_parts.append(field.type.name)
-            else:
-                col_parts.append(field.type)
+        if table_name in (None, getattr(enum_class, '_table_name', None)) and '_create_sql' in vars(enum_class):
+            return enum_class._create_sql
+        return _build_create_sql(_schema_fields(enum_class), table_name or enum_class.__name__)
 
-            if field.notnull:
-                col_parts.append("NOT NULL")
-            if field.unique:
-                col_parts.append("UNIQUE")
-            if field.pk:
-                col_parts.append("PRIMARY KEY")
-            if field.dflt_value is not None:
-                col_parts.append(f"DEFAULT {repr(field.dflt_value)}")
 
-            columns.append(" ".join(col_parts))
+_FLAG_SUFFIX: Tuple[Tuple[str, str], ...] = (
+    ("notnull", " NOT NULL"),
+    ("unique", " UNIQUE"),
+    ("pk", " PRIMARY KEY"),
+)
 
-        sql = f"CREATE TABLE IF NOT EXISTS {table_name} (\n    " + ",\n    ".join(columns) + "\n);"
-        return sql
+def schema(table_name: str = None):
+    '''
+    Class decorator that compiles the CREATE TABLE string once, at class definition
+
+    The class can be an Enum with SCHEMA.FIELD values or a plain class with
+    SCHEMA.FIELD attributes. The string is stored in '_create_sql' and
+    returned by SCHEMA.get_sql_create without iterating the class again.
+
+    Parameters
+    ----------
+    table_name : str
+        Table name. If not provided, the class name is used.
+
+    Example
+    -------
+    ```
+    @schema(table_name='users')
+    class users:
+        id = SCHEMA.FIELD(column=0, name='id', type='INTEGER', notnull=True, pk=True)
+        name = SCHEMA.FIELD(column=1, name='name', type='TEXT', notnull=True)
+
+    SCHEMA.get_sql_create(users)
+    ```
+    '''
+    def decorator(cls: type) -> type:
+        cls._table_name = table_name or cls.__name__
+        cls._create_sql = _build_create_sql(_schema_fields(cls), cls._table_name)
+        return cls
+    return decorator
+
+def _schema_fields(cls: type) -> Tuple[SCHEMA.FIELD, ...]:
+    '''
+    Returns the SCHEMA.FIELD definitions of an Enum or plain class, in order
+    '''
+    if issubclass(cls, Enum):
+        return tuple(member.value for member in cls)
+    return tuple(value for value in vars(cls).values() if isinstance(value, SCHEMA.FIELD))
+
+def _build_create_sql(fields: Tuple[SCHEMA.FIELD, ...], table_name: str) -> str:
+    '''
+    Returns the CREATE TABLE string of the fields
+    '''
+    columns = ",\n    ".join(_column_sql(field) for field in fields)
+    return f"CREATE TABLE IF NOT EXISTS {table_name} (\n    {columns}\n);"
+
+def _column_sql(field: SCHEMA.FIELD) -> str:
+    '''
+    Returns the column definition of a CREATE TABLE string
+    '''
+    type_name = field.type.name if isinstance(field.type, datatypes) else field.type
+    flags = "".join(kw for attr, kw in _FLAG_SUFFIX if getattr(field, attr))
+    default = f" DEFAULT {field.dflt_value!r}" if field.dflt_value is not None else ""
+    return f"{field.name} {type_name}{flags}{default}"
+
+
+def _get_table_fields(cur: sqlite3.Cursor, table: str) -> Dict[str, SCHEMA.FIELD]:
+    '''
+    Reads the PRAGMA table schema with the given cursor, cached while the
+    database file (device, inode), 'PRAGMA schema_version' and the table
+    CREATE sql do not change
+    '''
+    sql = '''
+    SELECT (SELECT file FROM pragma_database_list WHERE name='main'),
+           (SELECT schema_version FROM pragma_schema_version),
+           (SELECT sql FROM sqlite_master WHERE type='table' AND name=?);
+    '''
+    file, version, table_sql = cur.execute(sql, (table,)).fetchone()
+    key = stamp = None
+    if file:  # las bases de datos en memoria / temporales no tienen fichero
+        try:
+            stat = os.stat(file)
+        except OSError:
+            pass
+        else:
+            key = (os.path.realpath(file), table)
+            stamp = (stat.st_dev, stat.st_ino, version, table_sql)
+            cached = _SCHEMA_CACHE.get(key)
+            if cached and cached[0] == stamp:
+                return dict(cached[1])
+
+    # Primera columna de cada índice UNIQUE, en una sola consulta
+    sql = '''
+    SELECT il.name, ii.name FROM pragma_index_list(?) il
+    JOIN pragma_index_info(il.name) ii
+    WHERE il.[unique]=1 AND ii.seqno=0;
+    '''
+    uniques = {row[1] for row in cur.execute(sql, (table,)).fetchall()}
+
+    sql = '''SELECT cid, name, type, "notnull", dflt_value, pk FROM pragma_table_info(?);'''
+    tbl_data = cur.execute(sql, (table,)).fetchall()
+    data_dict = dict()
+    for field in tbl_data:
+        field_obj = SCHEMA.FIELD(*field, unique=field[1] in uniques)
+        data_dict[field_obj.name] = field_obj
+
+    if key is not None:
+        _SCHEMA_CACHE[key] = (stamp, data_dict)
+    return dict(data_dict)
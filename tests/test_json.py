@@ -0,0 +1,38 @@
+import json
+import unittest
+
+from mysqlite.mysqlite import _json_dumps, _json_loads
+
+
+class TestJsonCompatibility(unittest.TestCase):
+    '''
+    _json_loads / _json_dumps must give the stdlib json results, with or without orjson
+    '''
+    def test_loads(self):
+        documents = [
+            '{"a": 1, "b": [1.5, "x", null, true]}',
+            '{"a": NaN, "b": Infinity, "c": -Infinity}',
+            '{"a": 1e400}',
+            '"\\ud800"',
+            '{"n": 18446744073709551616, "m": -9223372036854775809}',
+            '[1, {"x": [2, 1180591620717411303424]}]',
+        ]
+        for document in documents:
+            with self.subTest(document=document):
+                self.assertEqual(repr(_json_loads(document)), repr(json.loads(document)))
+
+    def test_dumps(self):
+        values = [
+            {'a': 1, 'b': [1.5, 'x', None, True]},
+            float('nan'),
+            {'a': [float('inf'), float('-inf')]},
+            2 ** 70,
+            '\ud800',
+        ]
+        for value in values:
+            with self.subTest(value=value):
+                self.assertEqual(repr(json.loads(_json_dumps(value))), repr(json.loads(json.dumps(value))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+import warnings
+
+from mysqlite import SQL, ConnectionPool
+from mysqlite.mysqlite import _is_read
+
+
+TIMEOUT = 10
+
+
+class PoolTestCase(unittest.TestCase):
+    '''
+    Base test case with a temporary database and table 't (id, n)'
+    '''
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path_db = os.path.join(self.tmp.name, 'test.db')
+        self.db = SQL(self.path_db)
+        self.db.script('CREATE TABLE t (id INTEGER PRIMARY KEY, n INTEGER);')
+        self.db.insert_many('t', [{'id': i, 'n': i} for i in range(10)])
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.tmp.cleanup()
+
+    def run_threads(self, target, count: int) -> list:
+        '''Runs target(i) in count threads and returns the exceptions raised'''
+        errors = []
+        def run(i):
+            try:
+                target(i)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(TIMEOUT)
+            self.assertFalse(thread.is_alive(), "thread blocked")
+        return errors
+
+
+class TestIsRead(unittest.TestCase):
+
+    def test_reads(self):
+        for sql in (
+            'SELECT * FROM t',
+            '  select 1',
+            'WITH a AS (SELECT 1) SELECT * FROM a',
+            "SELECT * FROM pragma_table_info('t')",
+            'PRAGMA user_version',
+            'PRAGMA main.user_version;',
+            'SELECT last_update FROM t WHERE id=1',
+        ):
+            with self.subTest(sql=sql):
+                self.assertTrue(_is_read(sql))
+
+    def test_writes(self):
+        for sql in (
+            'INSERT INTO t VALUES (1)',
+            'UPDATE t SET n=1',
+            'CREATE TABLE x (a)',
+            'WITH a AS (SELECT 1) INSERT INTO t SELECT * FROM a',
+            'PRAGMA user_version=5',
+            'PRAGMA user_version(5)',
+            'PRAGMA foreign_keys(0)',
+            'PRAGMA table_info(t)',
+            'PRAGMA wal_checkpoint',
+            'PRAGMA wal_checkpoint(TRUNCATE)',
+            'PRAGMA optimize',
+            'selected',
+        ):
+            with self.subTest(sql=sql):
+                self.assertFalse(_is_read(sql))
+
+
+class TestRouting(PoolTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.routes = []
+        acquire = self.db._acquire
+        def spy(readonly: bool = False):
+            self.routes.append(readonly)
+            return acquire(readonly)
+        self.db._acquire = spy
+
+    def test_execute_routes_reads(self):
+        self.db.execute('SELECT * FROM t')
+        self.db.execute(sql='PRAGMA user_version')
+        self.db.execute('PRAGMA user_version(5)')
+        self.db.execute('UPDATE t SET n=0 WHERE id=1', fetch=0)
+        self.assertEqual(self.routes, [True, True, False, False])
+        self.assertEqual(self.db.execute('PRAGMA user_version', fetch=1), (5,))
+
+    def test_other_methods_use_writer(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            self.db.executemany('INSERT INTO t (n) VALUES (?)', [(1,)])
+        self.db.script('SELECT 1;')
+        self.db.get_table_fields('t')
+        self.assertEqual(self.routes, [False, False, False])
+
+
+class TestPoolExhaustion(PoolTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        # Un solo lector en el pool para forzar el agotamiento
+        self.db.close()
+        self.db._pool = ConnectionPool(self.path_db, min_size=1, max_size=1)
+
+    def test_nested_iter_select(self):
+        result = []
+        def nested(_):
+            for a, in self.db.iter_select('SELECT id FROM t WHERE id < 3'):
+                for b, in self.db.iter_select('SELECT id FROM t WHERE id < 3'):
+                    result.append((a, b, self.db.select('SELECT COUNT(*) FROM t')[0][0]))
+        self.assertEqual(self.run_threads(nested, 1), [])
+        self.assertEqual(len(result), 9)
+        self.assertTrue(all(count == 10 for _, _, count in result))
+
+    def test_iter_select_across_threads(self):
+        barrier = threading.Barrier(2, timeout=TIMEOUT)
+        def reader(_):
+            for row in self.db.iter_select('SELECT id FROM t'):
+                if row[0] == 0:
+                    barrier.wait()  # los dos threads con su lector ocupado
+                self.db.select('SELECT COUNT(*) FROM t')
+        self.assertEqual(self.run_threads(reader, 2), [])
+
+
+
+class TestConnectionPool(PoolTestCase):
+
+    def test_exhausted_pool_opens_temporary_reader(self):
+        pool = ConnectionPool(self.path_db, min_size=1, max_size=1)
+        first = pool.acquire_reader()
+        second = pool.acquire_reader()  # no bloquea: lector temporal
+        self.assertIsNot(first, second)
+        self.assertEqual(second.execute('SELECT COUNT(*) FROM t').fetchone(), (10,))
+        pool.release_reader(second)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            second.execute('SELECT 1')  # el temporal se cierra al liberarlo
+        pool.release_reader(first)
+        self.assertIs(pool.acquire_reader(), first)  # el del pool se reutiliza
+        pool.release_reader(first)
+        pool.close()
+
+    def test_readers_are_read_only(self):
+        pool = ConnectionPool(self.path_db, min_size=1, max_size=1)
+        conn = pool.acquire_reader()
+        with self.assertRaises(sqlite3.OperationalError):
+            conn.execute('INSERT INTO t (n) VALUES (1)')
+        pool.release_reader(conn)
+        pool.close()
+
+    def test_release_after_close(self):
+        pool = ConnectionPool(self.path_db, min_size=1, max_size=1)
+        conn = pool.acquire_reader()
+        pool.close()
+        pool.release_reader(conn)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute('SELECT 1')
+
+    def test_close_and_reopen(self):
+        self.db.close()
+        self.assertIsNone(self.db._pool)
+        self.db.insert('t', {'id': 100, 'n': 1})  # reabre el pool
+        self.assertIsNotNone(self.db._pool)
+        self.assertEqual(self.db.select('SELECT COUNT(*) FROM t'), [(11,)])
+        with SQL(self.path_db) as db:
+            self.assertEqual(db.select('SELECT COUNT(*) FROM t'), [(11,)])
+        self.assertIsNone(db._pool)
+
+    def test_single_pool_between_threads(self):
+        self.db.close()
+        barrier = threading.Barrier(8, timeout=TIMEOUT)
+        pools = []
+        def first_call(_):
+            barrier.wait()
+            self.db.select('SELECT 1')
+            pools.append(self.db._pool)
+        self.assertEqual(self.run_threads(first_call, 8), [])
+        self.assertEqual(len({id(pool) for pool in pools}), 1)
+
+    def test_concurrent_insert_select(self):
+        def worker(i):
+            for j in range(50):
+                self.db.insert('t', {'id': 1000 + i * 100 + j, 'n': j})
+                count = self.db.execute('SELECT COUNT(*) FROM t WHERE id >= ? AND id < ?', (1000 + i * 100, 1100 + i * 100), fetch=1)[0]
+                self.assertEqual(count, j + 1)  # cada thread lee sus propias escrituras
+        self.assertEqual(self.run_threads(worker, 8), [])
+        self.assertEqual(self.db.select('SELECT COUNT(*) FROM t'), [(410,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
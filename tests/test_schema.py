@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from mysqlite import SCHEMA
+from mysqlite.mysqlite import _SCHEMA_CACHE
+
+
+def create_db(path_db: str, sql: str) -> None:
+    conn = sqlite3.connect(path_db)
+    conn.executescript(sql)
+    conn.close()
+
+
+class TestTableFieldsCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        SCHEMA.clear_cache()
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        SCHEMA.clear_cache()
+        self.tmp.cleanup()
+
+    def test_same_relative_path_in_other_directory(self):
+        for name, columns in (('d1', 'a, b'), ('d2', 'x, y, z')):
+            os.mkdir(os.path.join(self.tmp.name, name))
+            create_db(os.path.join(self.tmp.name, name, 'db.db'), f'CREATE TABLE t ({columns});')
+
+        os.chdir(os.path.join(self.tmp.name, 'd1'))
+        self.assertEqual(list(SCHEMA.FIELD.get_table_fields('db.db', 't')), ['a', 'b'])
+        os.chdir(os.path.join(self.tmp.name, 'd2'))
+        self.assertEqual(list(SCHEMA.FIELD.get_table_fields('db.db', 't')), ['x', 'y', 'z'])
+
+    def test_recreated_database(self):
+        path_db = os.path.join(self.tmp.name, 'db.db')
+        create_db(path_db, 'CREATE TABLE t (a, b);')
+        self.assertEqual(list(SCHEMA.FIELD.get_table_fields(path_db, 't')), ['a', 'b'])
+
+        os.remove(path_db)
+        create_db(path_db, 'CREATE TABLE t (x, y, z);')
+        self.assertEqual(list(SCHEMA.FIELD.get_table_fields(path_db, 't')), ['x', 'y', 'z'])
+
+    def test_cache_hit_and_clear(self):
+        path_db = os.path.join(self.tmp.name, 'db.db')
+        create_db(path_db, 'CREATE TABLE t (a UNIQUE, b);')
+        fields = SCHEMA.FIELD.get_table_fields(path_db, 't')
+        self.assertTrue(fields['a'].unique)
+        self.assertEqual(SCHEMA.FIELD.get_table_fields(path_db, 't'), fields)
+        self.assertIn((os.path.realpath(path_db), 't'), _SCHEMA_CACHE)
+
+        # clear_cache normaliza la ruta igual que la clave de la caché
+        SCHEMA.clear_cache(os.path.relpath(path_db))
+        self.assertNotIn((os.path.realpath(path_db), 't'), _SCHEMA_CACHE)
+
+
+if __name__ == '__main__':
+    unittest.main()